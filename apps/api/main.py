@@ -8,12 +8,32 @@ from pydantic import BaseModel
 from typing import List, Optional
 from supabase import create_client, Client
 import httpx
-from datetime import datetime, timedelta
-from jose import jwt
+import asyncio
+import hashlib
+import logging
+import logging.handlers
+import queue
+import orjson
+import time
+from cachetools import TLRUCache, TTLCache
+import redis.asyncio as redis
+from contextlib import asynccontextmanager
+from datetime import datetime
+from jose import jwt, JWTError
 
 # Load environment variables
 load_dotenv(dotenv_path=".env.local")
 
+# Records are handed to a queue so handlers never block the event loop.
+# The queue handler is only attached while the app runs (see lifespan).
+logger = logging.getLogger("movierec")
+logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+log_queue = queue.SimpleQueue()
+log_queue_handler = logging.handlers.QueueHandler(log_queue)
+log_handler = logging.StreamHandler()
+log_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+log_listener = logging.handlers.QueueListener(log_queue, log_handler)
+
 # API Keys and clients
 api_key = os.getenv("OPENAI_API_KEY")
 openai_client = OpenAI(api_key=api_key) if api_key else None
@@ -22,13 +42,55 @@ SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_SERVICE_KEY = os.getenv("SUPABASE_SERVICE_KEY")
 SUPABASE_JWT_SECRET = os.getenv("SUPABASE_JWT_SECRET")
 TMDB_API_KEY = os.getenv("TMDB_API_KEY")
+REDIS_URL = os.getenv("REDIS_URL")
+
+# Upstream URL prefixes and shared query params (httpx doesn't mutate params)
+TMDB_BASE = "https://api.themoviedb.org/3"
+TMDB_PARAMS = {"api_key": TMDB_API_KEY}
+TMDB_DETAIL_PARAMS = {"api_key": TMDB_API_KEY, "append_to_response": "credits,videos"}
+POSTER_W500 = "https://image.tmdb.org/t/p/w500"
+PROFILE_W185 = "https://image.tmdb.org/t/p/w185"
+BACKDROP_ORIG = "https://image.tmdb.org/t/p/original"
+YOUTUBE_WATCH = "https://www.youtube.com/watch?v="
+OPENLIBRARY_BASE = "https://openlibrary.org"
+OPENLIBRARY_TRENDING_PARAMS = {"limit": 12}
+COVERS_BASE = "https://covers.openlibrary.org"
 
 # Initialize Supabase client
 supabase: Client = None
 if SUPABASE_URL and SUPABASE_SERVICE_KEY:
     supabase = create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Defer to an existing logging config (e.g. uvicorn --log-config) if there is one
+    use_log_queue = not logging.getLogger().handlers
+    if use_log_queue:
+        log_listener.start()
+        logger.addHandler(log_queue_handler)
+        logger.propagate = False
+    # One pooled client for all TMDB / Open Library calls so connections are reused
+    app.state.http = httpx.AsyncClient(
+        http2=True,
+        headers={"Accept-Encoding": "gzip, br", "User-Agent": "MovieRec/1.0"},
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+        timeout=10.0,
+    )
+    app.state.jwks = {}
+    await refresh_jwks()
+    # Shared cache across uvicorn workers when Redis is configured
+    app.state.redis = redis.Redis.from_url(REDIS_URL) if REDIS_URL else None
+    cache.redis = app.state.redis
+    yield
+    await app.state.http.aclose()
+    if app.state.redis:
+        await app.state.redis.aclose()
+    if use_log_queue:
+        logger.removeHandler(log_queue_handler)
+        logger.propagate = True
+        log_listener.stop()
+
+app = FastAPI(lifespan=lifespan)
 
 # CORS configuration
 FRONTEND_URL = os.getenv("FRONTEND_URL", "")
@@ -49,24 +111,91 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+async def run_query(query):
+    """Execute a blocking supabase-py query in a worker thread"""
+    return await asyncio.to_thread(query.execute)
+
 # ============ CACHING LAYER ============
+def encode_model(obj):
+    """orjson fallback for pydantic models stored in the cache"""
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    raise TypeError
+
+# Sentinel for upstream 404s cached briefly so repeated misses skip the round-trip
+NOT_FOUND = object()
+NOT_FOUND_MARKER = b"__not_found__"
+NEGATIVE_TTL = 60
+
 class Cache:
-    def __init__(self, ttl_hours: int = 1):
-        self._cache = {}
-        self._ttl = timedelta(hours=ttl_hours)
-    
-    def get(self, key: str):
-        if key in self._cache:
-            data, timestamp = self._cache[key]
-            if datetime.now() - timestamp < self._ttl:
-                return data
-            del self._cache[key]
-        return None
+    def __init__(self, ttl_hours: int = 1, maxsize: int = 10_000):
+        self._ttl = ttl_hours * 3600
+        # Bounded LRU; each entry carries its own lifetime so callers can override it.
+        # Entries are (value, lifetime, fresh_until). Used when Redis isn't configured (local dev).
+        self._cache = TLRUCache(maxsize=maxsize, ttu=lambda key, entry, now: now + entry[1])
+        self.redis = None
+    
+    async def get(self, key: str):
+        if self.redis:
+            try:
+                data = await self.redis.get(key)
+                if data == NOT_FOUND_MARKER:
+                    return NOT_FOUND
+                return orjson.loads(data) if data is not None else None
+            except Exception as e:
+                logger.warning("Redis get error: %s", e)
+                return None
+        entry = self._cache.get(key)
+        return entry[0] if entry else None
+    
+    async def get_entry(self, key: str):
+        """Return (value, is_stale) for keys written with stale_ttl"""
+        if self.redis:
+            try:
+                data, fresh = await self.redis.mget(key, key + ":fresh")
+                if data == NOT_FOUND_MARKER:
+                    return NOT_FOUND, False
+                if data is None:
+                    return None, False
+                return orjson.loads(data), fresh is None
+            except Exception as e:
+                logger.warning("Redis get error: %s", e)
+                return None, False
+        entry = self._cache.get(key)
+        if not entry:
+            return None, False
+        return entry[0], time.time() >= entry[2]
+    
+    async def set(self, key: str, value, ttl: Optional[int] = None, stale_ttl: int = 0):
+        """Cache value for ttl seconds, then keep serving it as stale for stale_ttl more"""
+        ttl = ttl or self._ttl
+        if self.redis:
+            try:
+                if stale_ttl:
+                    # Freshness is tracked in a companion key that expires first
+                    async with self.redis.pipeline(transaction=False) as pipe:
+                        pipe.set(key, orjson.dumps(value, default=encode_model), ex=ttl + stale_ttl)
+                        pipe.set(key + ":fresh", b"1", ex=ttl)
+                        await pipe.execute()
+                else:
+                    await self.redis.set(key, orjson.dumps(value, default=encode_model), ex=ttl)
+            except Exception as e:
+                logger.warning("Redis set error: %s", e)
+            return
+        self._cache[key] = (value, ttl + stale_ttl, time.time() + ttl)
     
-    def set(self, key: str, value):
-        self._cache[key] = (value, datetime.now())
+    async def set_negative(self, key: str, ttl: int = NEGATIVE_TTL):
+        if self.redis:
+            try:
+                await self.redis.set(key, NOT_FOUND_MARKER, ex=ttl)
+            except Exception as e:
+                logger.warning("Redis set error: %s", e)
+            return
+        self._cache[key] = (NOT_FOUND, ttl, time.time() + ttl)
 
 cache = Cache(ttl_hours=1)
+# Trending lists may be served stale for this long while they refresh in the background
+TRENDING_STALE_TTL = 3600
 
 # ============ PYDANTIC MODELS ============
 class Movie(BaseModel):
@@ -93,7 +222,25 @@ class ListItem(BaseModel):
     title: str
     image_url: Optional[str] = None
 
+class TrendingItem(BaseModel):
+    # Fresh TMDB results are built with model_construct and returned as model
+    # instances, which response validation passes through as-is. Dicts (mock
+    # data, Redis hits) are still validated.
+    id: int
+    title: str
+    poster_path: Optional[str] = None
+    release_date: Optional[str] = None
+    vote_average: Optional[float] = None
+    overview: str = ""
+
+class TrendingResults(BaseModel):
+    results: List[TrendingItem]
+
 # ============ AUTH MIDDLEWARE ============
+# Verified users keyed by SHA-256 of the token (raw tokens are never stored)
+AUTH_CACHE_TTL = 5
+auth_cache = TTLCache(maxsize=10000, ttl=AUTH_CACHE_TTL)
+
 async def get_current_user(authorization: Optional[str] = Header(None)):
     if not authorization or not authorization.startswith("Bearer "):
         raise HTTPException(status_code=401, detail="Not authenticated")
@@ -103,20 +250,95 @@ async def get_current_user(authorization: Optional[str] = Header(None)):
     if not supabase:
         raise HTTPException(status_code=500, detail="Supabase not configured")
     
+    key = hashlib.sha256(token.encode()).digest()
+    now = time.time()
+    cached = auth_cache.get(key)
+    if cached:
+        user, expires_at = cached
+        if now < expires_at:
+            return user
+        auth_cache.pop(key, None)
+    
+    user = await verify_token(token)
+    
+    # Never cache a verification past the token's own expiry
+    expires_at = now + AUTH_CACHE_TTL
+    try:
+        exp = jwt.get_unverified_claims(token).get("exp")
+        if exp:
+            expires_at = min(expires_at, float(exp))
+    except Exception:
+        pass
+    if expires_at > now:
+        auth_cache[key] = (user, expires_at)
+    
+    return user
+
+class AuthUser:
+    """Minimal user object built from verified JWT claims"""
+    def __init__(self, user_id, email=None):
+        self.id = user_id
+        self.email = email
+
+# Supabase signing keys are fetched once at startup and cached by kid
+JWKS_REFRESH_INTERVAL = 60
+jwks_fetched_at = 0.0
+
+async def refresh_jwks():
+    """Fetch the Supabase JWKS into app.state.jwks (at most once per interval)"""
+    global jwks_fetched_at
+    if not SUPABASE_URL or time.time() - jwks_fetched_at < JWKS_REFRESH_INTERVAL:
+        return
+    jwks_fetched_at = time.time()
+    try:
+        response = await app.state.http.get(f"{SUPABASE_URL}/auth/v1/.well-known/jwks.json")
+        response.raise_for_status()
+        app.state.jwks = {k["kid"]: k for k in orjson.loads(response.content).get("keys", []) if k.get("kid")}
+    except Exception as e:
+        logger.warning("JWKS fetch error: %s", e)
+
+async def verify_token(token: str):
+    """Verify a bearer token locally against the JWKS, falling back to Supabase"""
+    try:
+        kid = jwt.get_unverified_header(token).get("kid")
+    except JWTError:
+        raise HTTPException(status_code=401, detail="Invalid token")
+    
+    if kid and kid not in app.state.jwks:
+        # Unknown kid - the signing keys may have been rotated
+        await refresh_jwks()
+    
+    key = app.state.jwks.get(kid) if kid else None
+    if key:
+        try:
+            payload = jwt.decode(token, key, algorithms=["RS256", "ES256"], audience="authenticated")
+        except JWTError as jwt_error:
+            logger.info("JWT decode error: %s", jwt_error)
+            raise HTTPException(status_code=401, detail="Invalid token")
+        
+        user_id = payload.get("sub")
+        if not user_id:
+            raise HTTPException(status_code=401, detail="Invalid token payload")
+        return AuthUser(user_id, payload.get("email"))
+    
+    # Slow path: tokens signed with a key we don't have (e.g. legacy HS256 secret)
+    return await verify_token_remote(token)
+
+async def verify_token_remote(token: str):
+    """Verify a bearer token against Supabase, falling back to local HS256 decoding"""
     try:
         # Verify JWT token directly using Supabase admin client
         # The service key allows us to verify user tokens
-        response = supabase.auth.get_user(token)
+        response = await asyncio.to_thread(supabase.auth.get_user, token)
         
         if not response or not response.user:
             raise HTTPException(status_code=401, detail="Invalid token")
         
         return response.user
     except Exception as e:
-        print(f"Auth error: {e}")
+        logger.info("Remote auth failed, trying local JWT decode: %s", e)
         # Try alternative method using JWT decoding
         try:
-            from jose import jwt, JWTError
             # Use the JWT secret to verify the token
             # Supabase signs JWTs with the JWT_SECRET
             jwt_secret = SUPABASE_JWT_SECRET if SUPABASE_JWT_SECRET else SUPABASE_SERVICE_KEY
@@ -131,15 +353,9 @@ async def get_current_user(authorization: Optional[str] = Header(None)):
             if not user_id:
                 raise HTTPException(status_code=401, detail="Invalid token payload")
             
-            # Create a minimal user object
-            class User:
-                def __init__(self, user_id, email=None):
-                    self.id = user_id
-                    self.email = email or payload.get("email")
-            
-            return User(user_id)
+            return AuthUser(user_id, payload.get("email"))
         except JWTError as jwt_error:
-            print(f"JWT decode error: {jwt_error}")
+            logger.info("JWT decode error: %s", jwt_error)
             raise HTTPException(status_code=401, detail="Invalid token")
 
 async def get_optional_user(authorization: Optional[str] = Header(None)):
@@ -151,14 +367,12 @@ async def get_optional_user(authorization: Optional[str] = Header(None)):
     except HTTPException:
         # Expected when user is not authenticated or token is invalid
         return None
-    except Exception as e:
+    except Exception:
         # Log unexpected errors but don't crash - user just won't be authenticated
-        print(f"Unexpected auth error in get_optional_user: {e}")
+        logger.exception("Unexpected auth error in get_optional_user")
         return None
 
 # ============ EXISTING OPENAI RECOMMENDATION ENDPOINT ============
-movie_result_json = None
-
 async def get_openai_recommendation(movies: List[Movie]):
     if not openai_client:
         return "OpenAI API key not configured. Please add your API key to apps/api/.env.local"
@@ -174,8 +388,8 @@ async def get_openai_recommendation(movies: List[Movie]):
             ]
         )
         return response.choices[0].message.content
-    except Exception as e:
-        print(f"An error occurred: {e}")
+    except Exception:
+        logger.exception("OpenAI recommendation error")
         return "I am having trouble getting a recommendation for you right now."
 
 @app.post("/api/recs")
@@ -183,20 +397,56 @@ async def get_recommendations(movie_recs: MovieRecs):
     try:
         recommendation_json = await get_openai_recommendation(movie_recs.movies)
         
-        global movie_result_json
-        movie_result_json = recommendation_json
-        print(recommendation_json)
+        logger.debug("Recommendation: %s", recommendation_json)
         return {"recommendation": recommendation_json}
 
-    except Exception as err:
-        print(err)
+    except Exception:
+        logger.exception("Recommendation request error")
         return {"error": "Something went wrong with API recommendation request."}
 
+# ============ REQUEST COALESCING ============
+# Upstream fetches currently in flight, keyed like the cache
+inflight: dict = {}
+
+def finish_inflight(key: str, task):
+    inflight.pop(key, None)
+    # Mark the exception retrieved in case every awaiting caller was cancelled
+    if not task.cancelled():
+        task.exception()
+
+async def coalesce(key: str, fetch):
+    """Run fetch() once per key; concurrent callers await the same result"""
+    task = inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(fetch())
+        inflight[key] = task
+        task.add_done_callback(lambda t: finish_inflight(key, t))
+    # Shield so one client disconnecting doesn't cancel the fetch for its peers
+    return await asyncio.shield(task)
+
+# Strong references so pending background refreshes aren't garbage collected
+background_refreshes = set()
+
+async def revalidate(key: str, fetch):
+    try:
+        await coalesce(key, fetch)
+    except Exception as e:
+        logger.warning("Background refresh of %s failed: %s", key, e)
+
+async def get_or_revalidate(key: str, fetch):
+    """Return the cached value, refreshing it in the background once it goes stale"""
+    value, stale = await cache.get_entry(key)
+    if stale and key not in inflight:
+        task = asyncio.create_task(revalidate(key, fetch))
+        background_refreshes.add(task)
+        task.add_done_callback(background_refreshes.discard)
+    return value
+
 # ============ TRENDING ENDPOINTS ============
 @app.get("/api/trending/movies")
-async def get_trending_movies():
+async def get_trending_movies() -> TrendingResults:
     """Fetch trending movies from TMDB API with caching"""
-    cached = cache.get("trending_movies")
+    cached = await get_or_revalidate("trending_movies", fetch_trending_movies)
     if cached:
         return cached
     
@@ -211,337 +461,377 @@ async def get_trending_movies():
         }
         return mock_data
     
+    return await coalesce("trending_movies", fetch_trending_movies)
+
+async def fetch_trending_movies():
+    """Fetch this week's trending movies from TMDB and cache them"""
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"https://api.themoviedb.org/3/trending/movie/week",
-                params={"api_key": TMDB_API_KEY}
+        client = app.state.http
+        response = await client.get(
+            TMDB_BASE + "/trending/movie/week",
+            params=TMDB_PARAMS
+        )
+        response.raise_for_status()
+        # Keep only the items we render; the rest of the payload is dropped right away
+        results = orjson.loads(response.content).get("results", [])[:12]
+        
+        # Transform the data
+        movies = [
+            TrendingItem.model_construct(
+                id=movie["id"],
+                title=movie["title"],
+                poster_path=POSTER_W500 + poster_path if (poster_path := movie.get("poster_path")) else None,
+                release_date=movie.get("release_date"),
+                vote_average=movie.get("vote_average"),
+                overview=(movie.get("overview") or "")[:150]
             )
-            response.raise_for_status()
-            data = response.json()
-            
-            # Transform the data
-            movies = []
-            for movie in data.get("results", [])[:12]:
-                movies.append({
-                    "id": movie["id"],
-                    "title": movie["title"],
-                    "poster_path": f"https://image.tmdb.org/t/p/w500{movie['poster_path']}" if movie.get("poster_path") else None,
-                    "release_date": movie.get("release_date"),
-                    "vote_average": movie.get("vote_average"),
-                    "overview": movie.get("overview", "")[:150]
-                })
-            
-            result = {"results": movies}
-            cache.set("trending_movies", result)
-            return result
-    except Exception as e:
-        print(f"TMDB API error: {e}")
+            for movie in results
+        ]
+        
+        result = TrendingResults.model_construct(results=movies)
+        await cache.set("trending_movies", result, stale_ttl=TRENDING_STALE_TTL)
+        return result
+    except Exception:
+        logger.exception("TMDB API error")
         raise HTTPException(status_code=500, detail="Failed to fetch trending movies")
 
 @app.get("/api/trending/shows")
-async def get_trending_shows():
+async def get_trending_shows() -> TrendingResults:
     """Fetch trending TV shows from TMDB API with caching"""
-    cached = cache.get("trending_shows")
+    cached = await get_or_revalidate("trending_shows", fetch_trending_shows)
     if cached:
         return cached
     
     if not TMDB_API_KEY:
         mock_data = {
             "results": [
-                {"id": 1, "name": "Arcane", "poster_path": "/images/arcane.jpg", "first_air_date": "2021-11-06", "vote_average": 9.0},
+                {"id": 1, "title": "Arcane", "poster_path": "/images/arcane.jpg", "release_date": "2021-11-06", "vote_average": 9.0},
             ]
         }
         return mock_data
     
+    return await coalesce("trending_shows", fetch_trending_shows)
+
+async def fetch_trending_shows():
+    """Fetch this week's trending TV shows from TMDB and cache them"""
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"https://api.themoviedb.org/3/trending/tv/week",
-                params={"api_key": TMDB_API_KEY}
+        client = app.state.http
+        response = await client.get(
+            TMDB_BASE + "/trending/tv/week",
+            params=TMDB_PARAMS
+        )
+        response.raise_for_status()
+        # Keep only the items we render; the rest of the payload is dropped right away
+        results = orjson.loads(response.content).get("results", [])[:12]
+        
+        shows = [
+            TrendingItem.model_construct(
+                id=show["id"],
+                title=show["name"],
+                poster_path=POSTER_W500 + poster_path if (poster_path := show.get("poster_path")) else None,
+                release_date=show.get("first_air_date"),
+                vote_average=show.get("vote_average"),
+                overview=(show.get("overview") or "")[:150]
             )
-            response.raise_for_status()
-            data = response.json()
-            
-            shows = []
-            for show in data.get("results", [])[:12]:
-                shows.append({
-                    "id": show["id"],
-                    "title": show["name"],
-                    "poster_path": f"https://image.tmdb.org/t/p/w500{show['poster_path']}" if show.get("poster_path") else None,
-                    "release_date": show.get("first_air_date"),
-                    "vote_average": show.get("vote_average"),
-                    "overview": show.get("overview", "")[:150]
-                })
-            
-            result = {"results": shows}
-            cache.set("trending_shows", result)
-            return result
-    except Exception as e:
-        print(f"TMDB API error: {e}")
+            for show in results
+        ]
+        
+        result = TrendingResults.model_construct(results=shows)
+        await cache.set("trending_shows", result, stale_ttl=TRENDING_STALE_TTL)
+        return result
+    except Exception:
+        logger.exception("TMDB API error")
         raise HTTPException(status_code=500, detail="Failed to fetch trending shows")
 
+# ============ DETAIL ENDPOINTS ============
+def extract_cast(credits: dict, limit: int = 10):
+    """Top-billed cast from a TMDB credits block"""
+    return [
+        {
+            "id": person["id"],
+            "name": person["name"],
+            "character": person.get("character"),
+            "profile_path": PROFILE_W185 + profile_path if (profile_path := person.get("profile_path")) else None
+        }
+        for person in (credits.get("cast") or [])[:limit]
+    ]
+
+def extract_trailer(data: dict):
+    """First YouTube trailer URL from a TMDB videos block"""
+    videos = (data.get("videos") or {}).get("results") or []
+    return next(
+        (YOUTUBE_WATCH + v["key"] for v in videos if v.get("type") == "Trailer" and v.get("site") == "YouTube"),
+        None
+    )
+
 @app.get("/api/movie/{movie_id}")
-async def get_movie_details(movie_id: int):
+async def get_movie_details(movie_id: int) -> dict:
     """Fetch movie details from TMDB API"""
     cache_key = f"movie_{movie_id}"
-    cached = cache.get(cache_key)
+    cached = await cache.get(cache_key)
+    if cached is NOT_FOUND:
+        raise HTTPException(status_code=404, detail="Movie not found")
     if cached:
         return cached
     
     if not TMDB_API_KEY:
         raise HTTPException(status_code=500, detail="TMDB API key not configured")
     
+    return await coalesce(cache_key, lambda: fetch_movie_details(movie_id, cache_key))
+
+async def fetch_movie_details(movie_id: int, cache_key: str):
+    """Fetch a movie with credits and videos from TMDB and cache it"""
     try:
-        async with httpx.AsyncClient() as client:
-            # Fetch movie details
-            response = await client.get(
-                f"https://api.themoviedb.org/3/movie/{movie_id}",
-                params={"api_key": TMDB_API_KEY, "append_to_response": "credits,videos"}
-            )
-            response.raise_for_status()
-            data = response.json()
-            
-            # Extract cast (top 10)
-            cast = []
-            for person in data.get("credits", {}).get("cast", [])[:10]:
-                cast.append({
-                    "id": person["id"],
-                    "name": person["name"],
-                    "character": person.get("character"),
-                    "profile_path": f"https://image.tmdb.org/t/p/w185{person['profile_path']}" if person.get("profile_path") else None
-                })
-            
-            # Extract director
-            director = None
-            for person in data.get("credits", {}).get("crew", []):
-                if person.get("job") == "Director":
-                    director = person["name"]
-                    break
-            
-            # Extract trailer
-            trailer = None
-            for video in data.get("videos", {}).get("results", []):
-                if video.get("type") == "Trailer" and video.get("site") == "YouTube":
-                    trailer = f"https://www.youtube.com/watch?v={video['key']}"
-                    break
-            
-            result = {
-                "id": data["id"],
-                "title": data["title"],
-                "overview": data.get("overview"),
-                "poster_path": f"https://image.tmdb.org/t/p/w500{data['poster_path']}" if data.get("poster_path") else None,
-                "backdrop_path": f"https://image.tmdb.org/t/p/original{data['backdrop_path']}" if data.get("backdrop_path") else None,
-                "release_date": data.get("release_date"),
-                "runtime": data.get("runtime"),
-                "vote_average": data.get("vote_average"),
-                "vote_count": data.get("vote_count"),
-                "genres": [g["name"] for g in data.get("genres", [])],
-                "tagline": data.get("tagline"),
-                "status": data.get("status"),
-                "budget": data.get("budget"),
-                "revenue": data.get("revenue"),
-                "director": director,
-                "cast": cast,
-                "trailer": trailer,
-                "media_type": "movie"
-            }
-            
-            cache.set(cache_key, result)
-            return result
+        client = app.state.http
+        # Fetch movie details
+        response = await client.get(
+            f"{TMDB_BASE}/movie/{movie_id}",
+            params=TMDB_DETAIL_PARAMS
+        )
+        response.raise_for_status()
+        data = orjson.loads(response.content)
+        
+        credits = data.get("credits") or {}
+        cast = extract_cast(credits)
+        
+        director = next((p["name"] for p in credits.get("crew") or [] if p.get("job") == "Director"), None)
+        
+        trailer = extract_trailer(data)
+        
+        result = {
+            "id": data["id"],
+            "title": data["title"],
+            "overview": data.get("overview"),
+            "poster_path": POSTER_W500 + poster_path if (poster_path := data.get("poster_path")) else None,
+            "backdrop_path": BACKDROP_ORIG + backdrop_path if (backdrop_path := data.get("backdrop_path")) else None,
+            "release_date": data.get("release_date"),
+            "runtime": data.get("runtime"),
+            "vote_average": data.get("vote_average"),
+            "vote_count": data.get("vote_count"),
+            "genres": [g["name"] for g in data.get("genres", [])],
+            "tagline": data.get("tagline"),
+            "status": data.get("status"),
+            "budget": data.get("budget"),
+            "revenue": data.get("revenue"),
+            "director": director,
+            "cast": cast,
+            "trailer": trailer,
+            "media_type": "movie"
+        }
+        
+        await cache.set(cache_key, result)
+        return result
     except httpx.HTTPStatusError as e:
         if e.response.status_code == 404:
+            await cache.set_negative(cache_key)
             raise HTTPException(status_code=404, detail="Movie not found")
         raise HTTPException(status_code=500, detail="Failed to fetch movie details")
-    except Exception as e:
-        print(f"TMDB API error: {e}")
+    except Exception:
+        logger.exception("TMDB API error")
         raise HTTPException(status_code=500, detail="Failed to fetch movie details")
 
 @app.get("/api/tv/{show_id}")
-async def get_tv_details(show_id: int):
+async def get_tv_details(show_id: int) -> dict:
     """Fetch TV show details from TMDB API"""
     cache_key = f"tv_{show_id}"
-    cached = cache.get(cache_key)
+    cached = await cache.get(cache_key)
+    if cached is NOT_FOUND:
+        raise HTTPException(status_code=404, detail="TV show not found")
     if cached:
         return cached
     
     if not TMDB_API_KEY:
         raise HTTPException(status_code=500, detail="TMDB API key not configured")
     
+    return await coalesce(cache_key, lambda: fetch_tv_details(show_id, cache_key))
+
+async def fetch_tv_details(show_id: int, cache_key: str):
+    """Fetch a TV show with credits and videos from TMDB and cache it"""
     try:
-        async with httpx.AsyncClient() as client:
-            # Fetch TV show details
-            response = await client.get(
-                f"https://api.themoviedb.org/3/tv/{show_id}",
-                params={"api_key": TMDB_API_KEY, "append_to_response": "credits,videos"}
-            )
-            response.raise_for_status()
-            data = response.json()
-            
-            # Extract cast (top 10)
-            cast = []
-            for person in data.get("credits", {}).get("cast", [])[:10]:
-                cast.append({
-                    "id": person["id"],
-                    "name": person["name"],
-                    "character": person.get("character"),
-                    "profile_path": f"https://image.tmdb.org/t/p/w185{person['profile_path']}" if person.get("profile_path") else None
-                })
-            
-            # Extract creator
-            creators = [c["name"] for c in data.get("created_by", [])]
-            
-            # Extract trailer
-            trailer = None
-            for video in data.get("videos", {}).get("results", []):
-                if video.get("type") == "Trailer" and video.get("site") == "YouTube":
-                    trailer = f"https://www.youtube.com/watch?v={video['key']}"
-                    break
-            
-            result = {
-                "id": data["id"],
-                "title": data["name"],
-                "overview": data.get("overview"),
-                "poster_path": f"https://image.tmdb.org/t/p/w500{data['poster_path']}" if data.get("poster_path") else None,
-                "backdrop_path": f"https://image.tmdb.org/t/p/original{data['backdrop_path']}" if data.get("backdrop_path") else None,
-                "first_air_date": data.get("first_air_date"),
-                "last_air_date": data.get("last_air_date"),
-                "number_of_seasons": data.get("number_of_seasons"),
-                "number_of_episodes": data.get("number_of_episodes"),
-                "episode_run_time": data.get("episode_run_time", [None])[0] if data.get("episode_run_time") else None,
-                "vote_average": data.get("vote_average"),
-                "vote_count": data.get("vote_count"),
-                "genres": [g["name"] for g in data.get("genres", [])],
-                "tagline": data.get("tagline"),
-                "status": data.get("status"),
-                "creators": creators,
-                "cast": cast,
-                "trailer": trailer,
-                "media_type": "tv"
-            }
-            
-            cache.set(cache_key, result)
-            return result
+        client = app.state.http
+        # Fetch TV show details
+        response = await client.get(
+            f"{TMDB_BASE}/tv/{show_id}",
+            params=TMDB_DETAIL_PARAMS
+        )
+        response.raise_for_status()
+        data = orjson.loads(response.content)
+        
+        credits = data.get("credits") or {}
+        cast = extract_cast(credits)
+        
+        creators = [c["name"] for c in data.get("created_by") or []]
+        
+        trailer = extract_trailer(data)
+        
+        result = {
+            "id": data["id"],
+            "title": data["name"],
+            "overview": data.get("overview"),
+            "poster_path": POSTER_W500 + poster_path if (poster_path := data.get("poster_path")) else None,
+            "backdrop_path": BACKDROP_ORIG + backdrop_path if (backdrop_path := data.get("backdrop_path")) else None,
+            "first_air_date": data.get("first_air_date"),
+            "last_air_date": data.get("last_air_date"),
+            "number_of_seasons": data.get("number_of_seasons"),
+            "number_of_episodes": data.get("number_of_episodes"),
+            "episode_run_time": run_times[0] if (run_times := data.get("episode_run_time")) else None,
+            "vote_average": data.get("vote_average"),
+            "vote_count": data.get("vote_count"),
+            "genres": [g["name"] for g in data.get("genres", [])],
+            "tagline": data.get("tagline"),
+            "status": data.get("status"),
+            "creators": creators,
+            "cast": cast,
+            "trailer": trailer,
+            "media_type": "tv"
+        }
+        
+        await cache.set(cache_key, result)
+        return result
     except httpx.HTTPStatusError as e:
         if e.response.status_code == 404:
+            await cache.set_negative(cache_key)
             raise HTTPException(status_code=404, detail="TV show not found")
         raise HTTPException(status_code=500, detail="Failed to fetch TV show details")
-    except Exception as e:
-        print(f"TMDB API error: {e}")
+    except Exception:
+        logger.exception("TMDB API error")
         raise HTTPException(status_code=500, detail="Failed to fetch TV show details")
 
 @app.get("/api/book/{book_id}")
-async def get_book_details(book_id: str):
+async def get_book_details(book_id: str) -> dict:
     """Fetch book details from Open Library API"""
     cache_key = f"book_{book_id}"
-    cached = cache.get(cache_key)
+    cached = await cache.get(cache_key)
+    if cached is NOT_FOUND:
+        raise HTTPException(status_code=404, detail="Book not found")
     if cached:
         return cached
     
+    return await coalesce(cache_key, lambda: fetch_book_details(book_id, cache_key))
+
+async def fetch_book_details(book_id: str, cache_key: str):
+    """Fetch a work and its authors from Open Library and cache it"""
     try:
-        async with httpx.AsyncClient() as client:
-            # Fetch book details from Open Library
-            response = await client.get(
-                f"https://openlibrary.org/works/{book_id}.json"
-            )
-            response.raise_for_status()
-            data = response.json()
-            
-            # Get author details
-            authors = []
-            for author_ref in data.get("authors", []):
-                author_key = author_ref.get("author", {}).get("key", "")
-                if author_key:
-                    try:
-                        author_response = await client.get(
-                            f"https://openlibrary.org{author_key}.json"
-                        )
-                        if author_response.status_code == 200:
-                            author_data = author_response.json()
-                            authors.append({
-                                "name": author_data.get("name"),
-                                "bio": author_data.get("bio", {}).get("value") if isinstance(author_data.get("bio"), dict) else author_data.get("bio"),
-                                "photo": f"https://covers.openlibrary.org/a/olid/{author_key.split('/')[-1]}-M.jpg"
-                            })
-                    except (httpx.RequestError, httpx.HTTPStatusError) as e:
-                        # Network or HTTP errors - skip this author but continue with others
-                        print(f"Failed to fetch author {author_key}: {e}")
-                    except (KeyError, TypeError, ValueError) as e:
-                        # Data parsing errors - skip this author but continue with others
-                        print(f"Failed to parse author data for {author_key}: {e}")
-            
-            # Get cover
-            cover_id = None
-            if data.get("covers"):
-                cover_id = data["covers"][0]
-            
-            # Get description
-            description = data.get("description")
-            if isinstance(description, dict):
-                description = description.get("value", "")
-            
-            # Get subjects/genres
-            subjects = data.get("subjects", [])[:10] if data.get("subjects") else []
-            
-            # Try to get edition info for more details
-            first_publish_year = data.get("first_publish_date", "").split()[-1] if data.get("first_publish_date") else None
-            
-            result = {
-                "id": book_id,
-                "title": data.get("title"),
-                "description": description,
-                "cover_url": f"https://covers.openlibrary.org/b/id/{cover_id}-L.jpg" if cover_id else None,
-                "cover_url_large": f"https://covers.openlibrary.org/b/id/{cover_id}-L.jpg" if cover_id else None,
-                "authors": authors,
-                "subjects": subjects,
-                "first_publish_year": first_publish_year,
-                "revision": data.get("revision"),
-                "media_type": "book"
-            }
-            
-            cache.set(cache_key, result)
-            return result
+        client = app.state.http
+        # Fetch book details from Open Library
+        response = await client.get(
+            f"{OPENLIBRARY_BASE}/works/{book_id}.json"
+        )
+        response.raise_for_status()
+        data = orjson.loads(response.content)
+        
+        # Get author details (fetched concurrently)
+        author_keys = [
+            author_ref.get("author", {}).get("key", "")
+            for author_ref in data.get("authors", [])
+        ]
+        author_keys = [key for key in author_keys if key]
+        author_responses = await asyncio.gather(
+            *(client.get(OPENLIBRARY_BASE + key + ".json") for key in author_keys),
+            return_exceptions=True
+        )
+        
+        authors = []
+        for author_key, author_response in zip(author_keys, author_responses):
+            if isinstance(author_response, Exception):
+                # Network or HTTP errors - skip this author but continue with others
+                logger.warning("Failed to fetch author %s: %s", author_key, author_response)
+                continue
+            if author_response.status_code != 200:
+                continue
+            try:
+                author_data = orjson.loads(author_response.content)
+                authors.append({
+                    "name": author_data.get("name"),
+                    "bio": author_data.get("bio", {}).get("value") if isinstance(author_data.get("bio"), dict) else author_data.get("bio"),
+                    "photo": f"{COVERS_BASE}/a/olid/{author_key.split('/')[-1]}-M.jpg"
+                })
+            except (KeyError, TypeError, ValueError) as e:
+                # Data parsing errors - skip this author but continue with others
+                logger.warning("Failed to parse author data for %s: %s", author_key, e)
+        
+        # Get cover
+        cover_id = None
+        if data.get("covers"):
+            cover_id = data["covers"][0]
+        
+        # Get description
+        description = data.get("description")
+        if isinstance(description, dict):
+            description = description.get("value", "")
+        
+        # Get subjects/genres
+        subjects = data.get("subjects", [])[:10] if data.get("subjects") else []
+        
+        # Try to get edition info for more details
+        first_publish_year = data.get("first_publish_date", "").split()[-1] if data.get("first_publish_date") else None
+        
+        result = {
+            "id": book_id,
+            "title": data.get("title"),
+            "description": description,
+            "cover_url": f"{COVERS_BASE}/b/id/{cover_id}-L.jpg" if cover_id else None,
+            "cover_url_large": f"{COVERS_BASE}/b/id/{cover_id}-L.jpg" if cover_id else None,
+            "authors": authors,
+            "subjects": subjects,
+            "first_publish_year": first_publish_year,
+            "revision": data.get("revision"),
+            "media_type": "book"
+        }
+        
+        await cache.set(cache_key, result)
+        return result
     except httpx.HTTPStatusError as e:
         if e.response.status_code == 404:
+            await cache.set_negative(cache_key)
             raise HTTPException(status_code=404, detail="Book not found")
         raise HTTPException(status_code=500, detail="Failed to fetch book details")
-    except Exception as e:
-        print(f"Open Library API error: {e}")
+    except Exception:
+        logger.exception("Open Library API error")
         raise HTTPException(status_code=500, detail="Failed to fetch book details")
 
 @app.get("/api/trending/books")
-async def get_trending_books():
+async def get_trending_books() -> dict:
     """Fetch trending/popular books from Open Library API with caching"""
-    cached = cache.get("trending_books")
+    cached = await get_or_revalidate("trending_books", fetch_trending_books)
     if cached:
         return cached
     
+    return await coalesce("trending_books", fetch_trending_books)
+
+async def fetch_trending_books():
+    """Fetch today's trending books from Open Library and cache them"""
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            # Open Library trending/popular books
-            response = await client.get(
-                "https://openlibrary.org/trending/daily.json",
-                params={"limit": 12}
-            )
-            response.raise_for_status()
-            data = response.json()
-            
-            books = []
-            for work in data.get("works", [])[:12]:
-                cover_id = work.get("cover_i")
-                books.append({
-                    "id": work.get("key", "").replace("/works/", ""),
-                    "title": work.get("title"),
-                    "author": work.get("author_name", ["Unknown"])[0] if work.get("author_name") else "Unknown",
-                    "cover_url": f"https://covers.openlibrary.org/b/id/{cover_id}-M.jpg" if cover_id else None,
-                    "first_publish_year": work.get("first_publish_year"),
-                })
-            
-            result = {"results": books}
-            cache.set("trending_books", result)
-            return result
+        client = app.state.http
+        # Open Library trending/popular books
+        response = await client.get(
+            OPENLIBRARY_BASE + "/trending/daily.json",
+            params=OPENLIBRARY_TRENDING_PARAMS
+        )
+        response.raise_for_status()
+        data = orjson.loads(response.content)
+        
+        books = []
+        for work in data.get("works", [])[:12]:
+            cover_id = work.get("cover_i")
+            books.append({
+                "id": work.get("key", "").replace("/works/", ""),
+                "title": work.get("title"),
+                "author": work.get("author_name", ["Unknown"])[0] if work.get("author_name") else "Unknown",
+                "cover_url": f"{COVERS_BASE}/b/id/{cover_id}-M.jpg" if cover_id else None,
+                "first_publish_year": work.get("first_publish_year"),
+            })
+        
+        result = {"results": books}
+        await cache.set("trending_books", result, stale_ttl=TRENDING_STALE_TTL)
+        return result
     except httpx.TimeoutException:
-        print(f"Open Library API timeout - returning fallback data")
+        # Keep serving a stale list (e.g. during a background refresh) over the fallback
+        old_cached = await cache.get("trending_books")
+        if old_cached:
+            logger.warning("Open Library API timeout - returning stale cache")
+            return old_cached
+        logger.warning("Open Library API timeout - returning fallback data")
         # Return fallback popular books
         fallback = {
             "results": [
@@ -553,14 +843,14 @@ async def get_trending_books():
                 {"id": "OL27516W", "title": "Harry Potter and the Philosopher's Stone", "author": "J.K. Rowling", "cover_url": "https://covers.openlibrary.org/b/id/10521270-M.jpg", "first_publish_year": 1997},
             ]
         }
-        cache.set("trending_books", fallback, ttl=300)  # Cache for 5 minutes
+        await cache.set("trending_books", fallback, ttl=300, stale_ttl=TRENDING_STALE_TTL)  # Retry after 5 minutes
         return fallback
-    except Exception as e:
-        print(f"Open Library API error: {e}")
+    except Exception:
+        logger.exception("Open Library API error")
         # Try to return any existing cache even if expired
-        old_cached = cache.get("trending_books")
+        old_cached = await cache.get("trending_books")
         if old_cached:
-            print("Returning stale cache due to API error")
+            logger.info("Returning stale cache due to API error")
             return old_cached
         # Return fallback as last resort
         fallback = {
@@ -584,7 +874,7 @@ async def get_user_profile(user = Depends(get_current_user)):
     
     try:
         # Get profile from profiles table
-        result = supabase.table("profiles").select("*").eq("id", user.id).single().execute()
+        result = await run_query(supabase.table("profiles").select("*").eq("id", user.id).single())
         
         if result.data:
             return {
@@ -601,7 +891,7 @@ async def get_user_profile(user = Depends(get_current_user)):
                 "username": user.email.split("@")[0],
                 "created_at": datetime.now().isoformat()
             }
-            supabase.table("profiles").insert(new_profile).execute()
+            await run_query(supabase.table("profiles").insert(new_profile))
             return {
                 "id": user.id,
                 "email": user.email,
@@ -609,8 +899,8 @@ async def get_user_profile(user = Depends(get_current_user)):
                 "avatar_url": None,
                 "created_at": new_profile["created_at"]
             }
-    except Exception as e:
-        print(f"Profile fetch error: {e}")
+    except Exception:
+        logger.exception("Profile fetch error")
         # Return basic user info if profile table doesn't exist
         return {
             "id": user.id,
@@ -633,14 +923,14 @@ async def update_user_profile(profile: UserProfile, user = Depends(get_current_u
             update_data["avatar_url"] = profile.avatar_url
         
         if update_data:
-            result = supabase.table("profiles").upsert({
+            result = await run_query(supabase.table("profiles").upsert({
                 "id": user.id,
                 **update_data
-            }).execute()
+            }))
         
         return {"message": "Profile updated successfully"}
-    except Exception as e:
-        print(f"Profile update error: {e}")
+    except Exception:
+        logger.exception("Profile update error")
         raise HTTPException(status_code=500, detail="Failed to update profile")
 
 # ============ REVIEWS ENDPOINTS ============
@@ -651,10 +941,10 @@ async def get_user_reviews(user = Depends(get_current_user)):
         raise HTTPException(status_code=500, detail="Supabase not configured")
     
     try:
-        result = supabase.table("reviews").select("*").eq("user_id", user.id).order("created_at", desc=True).execute()
+        result = await run_query(supabase.table("reviews").select("*").eq("user_id", user.id).order("created_at", desc=True))
         return {"reviews": result.data or []}
-    except Exception as e:
-        print(f"Reviews fetch error: {e}")
+    except Exception:
+        logger.exception("Reviews fetch error")
         return {"reviews": []}
 
 @app.post("/api/user/reviews")
@@ -673,10 +963,10 @@ async def create_review(review: Review, user = Depends(get_current_user)):
             "created_at": datetime.now().isoformat()
         }
         
-        result = supabase.table("reviews").insert(review_data).execute()
+        result = await run_query(supabase.table("reviews").insert(review_data))
         return {"message": "Review created successfully", "review": result.data[0] if result.data else None}
-    except Exception as e:
-        print(f"Review creation error: {e}")
+    except Exception:
+        logger.exception("Review creation error")
         raise HTTPException(status_code=500, detail="Failed to create review")
 
 # ============ LISTS ENDPOINTS (Watchlist, Favorites, etc.) ============
@@ -691,10 +981,10 @@ async def get_user_lists(list_type: Optional[str] = None, user = Depends(get_cur
         if list_type:
             query = query.eq("list_type", list_type)
         
-        result = query.order("created_at", desc=True).execute()
+        result = await run_query(query.order("created_at", desc=True))
         return {"items": result.data or []}
-    except Exception as e:
-        print(f"Lists fetch error: {e}")
+    except Exception:
+        logger.exception("Lists fetch error")
         return {"items": []}
 
 @app.post("/api/user/lists")
@@ -714,10 +1004,10 @@ async def add_to_list(item: ListItem, user = Depends(get_current_user)):
             "created_at": datetime.now().isoformat()
         }
         
-        result = supabase.table("user_lists").insert(list_data).execute()
+        result = await run_query(supabase.table("user_lists").insert(list_data))
         return {"message": "Item added to list", "item": result.data[0] if result.data else None}
-    except Exception as e:
-        print(f"List add error: {e}")
+    except Exception:
+        logger.exception("List add error")
         raise HTTPException(status_code=500, detail="Failed to add item to list")
 
 @app.delete("/api/user/lists/{item_id}")
@@ -727,10 +1017,10 @@ async def remove_from_list(item_id: str, user = Depends(get_current_user)):
         raise HTTPException(status_code=500, detail="Supabase not configured")
     
     try:
-        supabase.table("user_lists").delete().eq("id", item_id).eq("user_id", user.id).execute()
+        await run_query(supabase.table("user_lists").delete().eq("id", item_id).eq("user_id", user.id))
         return {"message": "Item removed from list"}
-    except Exception as e:
-        print(f"List remove error: {e}")
+    except Exception:
+        logger.exception("List remove error")
         raise HTTPException(status_code=500, detail="Failed to remove item from list")
 
 # ============ USER STATS ENDPOINT ============
@@ -741,25 +1031,33 @@ async def get_user_stats(user = Depends(get_current_user)):
         raise HTTPException(status_code=500, detail="Supabase not configured")
     
     try:
-        # Count reviews
-        reviews_result = supabase.table("reviews").select("id", count="exact").eq("user_id", user.id).execute()
-        reviews_count = reviews_result.count or 0
-        
-        # Count movies in lists
-        movies_result = supabase.table("user_lists").select("id", count="exact").eq("user_id", user.id).eq("media_type", "movie").execute()
-        movies_count = movies_result.count or 0
+        # All three counts in a single round-trip (see migrations/001_user_stats.sql)
+        result = await run_query(supabase.rpc("user_stats", {"uid": str(user.id)}))
+        stats = result.data or {}
         
-        # Count books in lists
-        books_result = supabase.table("user_lists").select("id", count="exact").eq("user_id", user.id).eq("media_type", "book").execute()
-        books_count = books_result.count or 0
+        return {
+            "total_reviews": stats.get("total_reviews", 0),
+            "total_movies": stats.get("total_movies", 0),
+            "total_books": stats.get("total_books", 0)
+        }
+    except Exception:
+        logger.warning("user_stats RPC failed, falling back to count queries", exc_info=True)
+    
+    try:
+        # Fallback for databases without the user_stats() function
+        reviews_result, movies_result, books_result = await asyncio.gather(
+            run_query(supabase.table("reviews").select("id", count="exact").eq("user_id", user.id)),
+            run_query(supabase.table("user_lists").select("id", count="exact").eq("user_id", user.id).eq("media_type", "movie")),
+            run_query(supabase.table("user_lists").select("id", count="exact").eq("user_id", user.id).eq("media_type", "book")),
+        )
         
         return {
-            "total_reviews": reviews_count,
-            "total_movies": movies_count,
-            "total_books": books_count
+            "total_reviews": reviews_result.count or 0,
+            "total_movies": movies_result.count or 0,
+            "total_books": books_result.count or 0
         }
-    except Exception as e:
-        print(f"Stats fetch error: {e}")
+    except Exception:
+        logger.exception("Stats fetch error")
         return {
             "total_reviews": 0,
             "total_movies": 0,
@@ -772,4 +1070,10 @@ def read_item(item_id: int):
     return {"item_id": item_id, "description": "A test item"}
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="127.0.0.1", port=8000)
+    # Workers each hold their own in-process cache; set REDIS_URL to share it
+    uvicorn.run(
+        "main:app",
+        host="127.0.0.1",
+        port=8000,
+        workers=int(os.getenv("WEB_CONCURRENCY", 1)),
+    )
@@ -0,0 +1,18 @@
+-- =============================================
+-- Migration 001: user_stats() function
+-- For databases created before it was added to supabase_setup.sql.
+-- Safe to re-run. Run in Supabase Dashboard > SQL Editor
+-- =============================================
+
+CREATE OR REPLACE FUNCTION public.user_stats(uid UUID)
+RETURNS JSON AS $$
+    SELECT json_build_object(
+        'total_reviews', (SELECT count(*) FROM public.reviews WHERE user_id = uid),
+        'total_movies', (SELECT count(*) FROM public.user_lists WHERE user_id = uid AND media_type = 'movie'),
+        'total_books', (SELECT count(*) FROM public.user_lists WHERE user_id = uid AND media_type = 'book')
+    );
+$$ LANGUAGE sql STABLE;
+
+-- Only the backend may call it (it takes an arbitrary user id)
+REVOKE EXECUTE ON FUNCTION public.user_stats(UUID) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.user_stats(UUID) TO service_role;
@@ -0,0 +1,19 @@
+-- =============================================
+-- Migration 002: composite indexes for per-user reviews and lists
+-- For databases created before these were added to supabase_setup.sql.
+-- Safe to re-run.
+--
+-- CONCURRENTLY avoids locking the tables but cannot run inside a transaction,
+-- so run this with psql (each statement autocommits), not the Supabase SQL
+-- Editor, which wraps the whole script in one transaction:
+--   psql "$DATABASE_URL" -f migrations/002_user_indexes.sql
+-- =============================================
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_reviews_user_created ON public.reviews(user_id, created_at DESC);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_user_lists_user_type_created ON public.user_lists(user_id, list_type, created_at DESC);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_user_lists_user_media ON public.user_lists(user_id, media_type);
+
+-- Superseded by the composite indexes above (prefix columns are covered)
+DROP INDEX CONCURRENTLY IF EXISTS public.idx_reviews_user_id;
+DROP INDEX CONCURRENTLY IF EXISTS public.idx_user_lists_user_id;
+DROP INDEX CONCURRENTLY IF EXISTS public.idx_user_lists_type;
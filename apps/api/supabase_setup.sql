@@ -136,14 +136,33 @@ CREATE TRIGGER on_auth_user_created
     AFTER INSERT ON auth.users
     FOR EACH ROW EXECUTE FUNCTION public.handle_new_user();
 
+-- =============================================
+-- Function to fetch user stats in one round-trip
+-- =============================================
+
+CREATE OR REPLACE FUNCTION public.user_stats(uid UUID)
+RETURNS JSON AS $$
+    SELECT json_build_object(
+        'total_reviews', (SELECT count(*) FROM public.reviews WHERE user_id = uid),
+        'total_movies', (SELECT count(*) FROM public.user_lists WHERE user_id = uid AND media_type = 'movie'),
+        'total_books', (SELECT count(*) FROM public.user_lists WHERE user_id = uid AND media_type = 'book')
+    );
+$$ LANGUAGE sql STABLE;
+
+-- Only the backend may call it (it takes an arbitrary user id)
+REVOKE EXECUTE ON FUNCTION public.user_stats(UUID) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.user_stats(UUID) TO service_role;
+
 -- =============================================
 -- Indexes for better performance
 -- =============================================
 
-CREATE INDEX IF NOT EXISTS idx_reviews_user_id ON public.reviews(user_id);
+-- Composite indexes match the API's filters and ORDER BY created_at DESC,
+-- so the user review/list queries and user_stats() counts stay on the index
+CREATE INDEX IF NOT EXISTS idx_reviews_user_created ON public.reviews(user_id, created_at DESC);
 CREATE INDEX IF NOT EXISTS idx_reviews_media ON public.reviews(media_type, media_id);
-CREATE INDEX IF NOT EXISTS idx_user_lists_user_id ON public.user_lists(user_id);
-CREATE INDEX IF NOT EXISTS idx_user_lists_type ON public.user_lists(user_id, list_type);
+CREATE INDEX IF NOT EXISTS idx_user_lists_user_type_created ON public.user_lists(user_id, list_type, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_user_lists_user_media ON public.user_lists(user_id, media_type);
 
 -- =============================================
 -- Grant permissions to authenticated users